@@ -0,0 +1 @@
+Add an `after` parameter to the [List Accounts admin API](https://matrix-org.github.io/synapse/latest/admin_api/user_admin_api.html#list-accounts) to paginate by user ID when ordering by name.
@@ -39,6 +39,7 @@ from synapse.rest.admin._base import (
 from synapse.rest.client._base import client_patterns
 from synapse.storage.databases.main.registration import ExternalIDReuseException
 from synapse.storage.databases.main.stats import UserSortOrder
+from synapse.storage.databases.main.users_admin import USERS_SORT_ORDERS
 from synapse.types import JsonDict, UserID
 
 if TYPE_CHECKING:
@@ -60,6 +61,8 @@ class UsersRestServletV2(RestServlet):
 
     The parameters `from` and `limit` are required only for pagination.
     By default, a `limit` of 100 is used.
+    When ordering by name, the parameter `after` can be used instead of `from`
+    to paginate by user ID.
     The parameter `user_id` can be used to filter by user id.
     The parameter `name` can be used to filter by user id or display name.
     The parameter `guests` can be used to exclude guest users.
@@ -120,28 +123,37 @@ class UsersRestServletV2(RestServlet):
             request,
             "order_by",
             default=UserSortOrder.NAME.value,
-            allowed_values=(
-                UserSortOrder.NAME.value,
-                UserSortOrder.DISPLAYNAME.value,
-                UserSortOrder.GUEST.value,
-                UserSortOrder.ADMIN.value,
-                UserSortOrder.DEACTIVATED.value,
-                UserSortOrder.USER_TYPE.value,
-                UserSortOrder.AVATAR_URL.value,
-                UserSortOrder.SHADOW_BANNED.value,
-                UserSortOrder.CREATION_TS.value,
-            ),
+            allowed_values=USERS_SORT_ORDERS,
         )
 
         direction = parse_enum(request, "dir", Direction, default=Direction.FORWARDS)
 
+        # Paginating by user ID avoids skipping over `from` rows in the database,
+        # but needs the users to be ordered by user ID.
+        after = parse_string(request, "after")
+        if after is not None:
+            if order_by != UserSortOrder.NAME.value:
+                raise SynapseError(
+                    HTTPStatus.BAD_REQUEST,
+                    "Query parameter after can only be used when ordering by name.",
+                    errcode=Codes.INVALID_PARAM,
+                )
+            if start != 0:
+                raise SynapseError(
+                    HTTPStatus.BAD_REQUEST,
+                    "Query parameters after and from cannot be used together.",
+                    errcode=Codes.INVALID_PARAM,
+                )
+
         # twisted.web.server.Request.args is incorrectly defined as Optional[Any]
         args: Dict[bytes, List[bytes]] = request.args  # type: ignore
         not_user_types = parse_strings_from_args(args, "not_user_type")
 
         users, total = await self.store.get_users_paginate(
             start,
-            limit,
+            # When paginating by user ID, fetch an extra user to find out whether
+            # there is another page.
+            limit if after is None else limit + 1,
             user_id,
             name,
             guests,
@@ -150,6 +162,8 @@ class UsersRestServletV2(RestServlet):
             direction,
             approved,
             not_user_types,
+            # An empty `after` starts from the first user.
+            after_name=after or None,
         )
 
         # If support for MSC3866 is not enabled, don't show the approval flag.
@@ -157,9 +171,20 @@ class UsersRestServletV2(RestServlet):
             for user in users:
                 del user["approved"]
 
+        if after is not None:
+            # With `limit=0` there is no user ID to continue from, so don't return
+            # a `next_token`.
+            has_more = 0 < limit < len(users)
+            users = users[:limit]
+        else:
+            has_more = (start + limit) < total
+
         ret = {"users": users, "total": total}
-        if (start + limit) < total:
-            ret["next_token"] = str(start + len(users))
+        if has_more:
+            if after is not None:
+                ret["next_token"] = users[-1]["name"]
+            else:
+                ret["next_token"] = str(start + len(users))
 
         return HTTPStatus.OK, ret
 
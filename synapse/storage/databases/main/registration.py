@@ -37,6 +37,7 @@ from synapse.storage.database import (
 )
 from synapse.storage.databases.main.cache import CacheInvalidationWorkerStore
 from synapse.storage.databases.main.stats import StatsStore
+from synapse.storage.engines import PostgresEngine
 from synapse.storage.types import Cursor
 from synapse.storage.util.id_generators import IdGenerator
 from synapse.storage.util.sequence import build_sequence_generator
@@ -579,9 +580,22 @@ class RegistrationWorkerStore(CacheInvalidationWorkerStore):
             self._invalidate_cache_and_stream(
                 txn, self.get_user_by_id, (user.to_string(),)
             )
+            self._invalidate_users_paginate_count_txn(txn)
 
         await self.db_pool.runInteraction("set_user_type", set_user_type_txn)
 
+    def _invalidate_users_paginate_count_txn(self, txn: LoggingTransaction) -> None:
+        """Invalidates the cached user counts of the admin users list.
+
+        These are keyed on the filters applied rather than on any user, so must be
+        invalidated entirely whenever a user is added or has one of the filtered
+        columns changed.
+        """
+        txn.call_after(
+            self._attempt_to_invalidate_cache, "_get_users_paginate_count", None
+        )
+        self._send_invalidation_to_replication(txn, "_get_users_paginate_count", None)
+
     def _query_for_auth(
         self, txn: LoggingTransaction, token: str
     ) -> Optional[TokenLookupResult]:
@@ -2013,6 +2027,32 @@ class RegistrationBackgroundUpdateStore(RegistrationWorkerStore):
             unique=False,
         )
 
+        self.db_pool.updates.register_background_update_handler(
+            "users_name_trgm_idx", self._background_users_name_trgm_index
+        )
+
+        self.db_pool.updates.register_background_update_handler(
+            "users_populate_profile_columns",
+            self._background_users_populate_profile_columns,
+        )
+
+        self.db_pool.updates.register_background_index_update(
+            "users_displayname_lower_idx",
+            index_name="users_displayname_lower",
+            table="users",
+            columns=["LOWER(displayname)"],
+        )
+
+        # Lets the admin users list find the (usually few) users awaiting
+        # approval without scanning the whole table.
+        self.db_pool.updates.register_background_index_update(
+            "users_unapproved_idx",
+            index_name="users_unapproved",
+            table="users",
+            columns=["name"],
+            where_clause="approved IS FALSE",
+        )
+
     async def _background_update_set_deactivated_flag(
         self, progress: JsonDict, batch_size: int
     ) -> int:
@@ -2079,6 +2119,123 @@ class RegistrationBackgroundUpdateStore(RegistrationWorkerStore):
 
         return nb_processed
 
+    async def _background_users_name_trgm_index(
+        self, progress: JsonDict, batch_size: int
+    ) -> int:
+        """Adds a trigram index on `users.name` on PostgreSQL, so that substring
+        searches of user IDs (`name LIKE '%term%'`) can use an index.
+
+        This needs the `pg_trgm` extension, which Synapse does not install itself.
+        If it isn't installed, the index is skipped and such searches continue to
+        scan the table. See docs/postgres.md for how to add the index later.
+        """
+
+        def has_pg_trgm_txn(txn: LoggingTransaction) -> bool:
+            txn.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            return txn.fetchone() is not None
+
+        def create_index(conn: LoggingDatabaseConnection) -> None:
+            conn.rollback()
+
+            # we have to set autocommit, because postgres refuses to
+            # CREATE INDEX CONCURRENTLY without it.
+            conn.set_session(autocommit=True)
+
+            try:
+                c = conn.cursor()
+
+                # Remove any invalid index left behind by a previous failed attempt.
+                c.execute("DROP INDEX IF EXISTS users_name_trgm")
+                c.execute(
+                    """
+                    CREATE INDEX CONCURRENTLY users_name_trgm
+                    ON users USING GIN (name gin_trgm_ops)
+                    """
+                )
+            finally:
+                conn.set_session(autocommit=False)
+
+        if isinstance(self.database_engine, PostgresEngine):
+            if await self.db_pool.runInteraction(
+                "users_name_trgm_idx_check_extension", has_pg_trgm_txn
+            ):
+                await self.db_pool.runWithConnection(create_index)
+            else:
+                logger.info(
+                    "Not adding trigram index on users.name, as the pg_trgm "
+                    "extension is not installed. See docs/postgres.md for how to "
+                    "add it."
+                )
+
+        await self.db_pool.updates._end_background_update("users_name_trgm_idx")
+        return 1
+
+    async def _background_users_populate_profile_columns(
+        self, progress: JsonDict, batch_size: int
+    ) -> int:
+        """Copies each user's displayname and avatar URL from `profiles`, and whether
+        they have been erased from `erased_users`, into `users`.
+
+        Later changes to those tables are copied by database triggers, see
+        `delta/80/03_users_profile_columns_triggers.py`.
+        """
+        last_user_id = progress.get("last_user_id", "")
+
+        def _background_users_populate_profile_columns_txn(
+            txn: LoggingTransaction,
+        ) -> int:
+            txn.execute(
+                """
+                SELECT name FROM users
+                WHERE name > ?
+                ORDER BY name ASC
+                LIMIT ?
+                """,
+                (last_user_id, batch_size),
+            )
+            user_ids = [row[0] for row in txn]
+            if not user_ids:
+                return 0
+
+            txn.execute(
+                """
+                UPDATE users SET
+                    displayname = (
+                        SELECT p.displayname FROM profiles AS p
+                        WHERE p.full_user_id = users.name
+                    ),
+                    avatar_url = (
+                        SELECT p.avatar_url FROM profiles AS p
+                        WHERE p.full_user_id = users.name
+                    ),
+                    erased = EXISTS (
+                        SELECT 1 FROM erased_users AS eu
+                        WHERE eu.user_id = users.name
+                    )
+                WHERE ? < name AND name <= ?
+                """,
+                (last_user_id, user_ids[-1]),
+            )
+
+            self.db_pool.updates._background_update_progress_txn(
+                txn,
+                "users_populate_profile_columns",
+                {"last_user_id": user_ids[-1]},
+            )
+            return len(user_ids)
+
+        nb_processed = await self.db_pool.runInteraction(
+            "users_populate_profile_columns",
+            _background_users_populate_profile_columns_txn,
+        )
+
+        if not nb_processed:
+            await self.db_pool.updates._end_background_update(
+                "users_populate_profile_columns"
+            )
+
+        return nb_processed
+
     async def set_user_deactivated_status(
         self, user_id: str, deactivated: bool
     ) -> None:
@@ -2110,6 +2267,7 @@ class RegistrationBackgroundUpdateStore(RegistrationWorkerStore):
         )
         self._invalidate_cache_and_stream(txn, self.get_user_by_id, (user_id,))
         txn.call_after(self.is_guest.invalidate, (user_id,))
+        self._invalidate_users_paginate_count_txn(txn)
 
     def update_user_approval_status_txn(
         self, txn: LoggingTransaction, user_id: str, approved: bool
@@ -2133,6 +2291,7 @@ class RegistrationBackgroundUpdateStore(RegistrationWorkerStore):
         # Invalidate the caches of methods that read the value of the 'approved' flag.
         self._invalidate_cache_and_stream(txn, self.get_user_by_id, (user_id,))
         self._invalidate_cache_and_stream(txn, self.is_user_approved, (user_id,))
+        self._invalidate_users_paginate_count_txn(txn)
 
 
 class RegistrationStore(StatsStore, RegistrationBackgroundUpdateStore):
@@ -2430,6 +2589,7 @@ class RegistrationStore(StatsStore, RegistrationBackgroundUpdateStore):
             )
 
         self._invalidate_cache_and_stream(txn, self.get_user_by_id, (user_id,))
+        self._invalidate_users_paginate_count_txn(txn)
 
     async def user_set_password_hash(
         self, user_id: str, password_hash: Optional[str]
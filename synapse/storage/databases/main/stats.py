@@ -75,12 +75,9 @@ TYPE_TO_ORIGIN_TABLE = {"room": ("rooms", "room_id"), "user": ("users", "name")}
 class UserSortOrder(Enum):
     """
     Enum to define the sorting method used when returning users
-    with get_users_paginate in __init__.py
+    with get_users_paginate in users_admin.py
     and get_users_media_usage_paginate in stats.py
 
-    When moves this to __init__.py gets `builtins.ImportError` with
-    `most likely due to a circular import`
-
     MEDIA_LENGTH = ordered by size of uploaded media.
     MEDIA_COUNT = ordered by number of uploaded media.
     USER_ID = ordered alphabetically by `user_id`.
@@ -0,0 +1,678 @@
+# Copyright 2023 The Matrix.org Foundation C.I.C.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+import sys
+from enum import Enum, auto
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Collection,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+from synapse.api.constants import Direction
+from synapse.logging.context import make_deferred_yieldable, run_in_background
+from synapse.storage._base import SQLBaseStore, make_in_list_sql_clause
+from synapse.storage.database import (
+    DatabasePool,
+    LoggingDatabaseConnection,
+    LoggingTransaction,
+)
+from synapse.storage.databases.main.stats import UserSortOrder
+from synapse.storage.engines import BaseDatabaseEngine, Sqlite3Engine
+from synapse.types import JsonDict
+from synapse.util import unwrapFirstError
+from synapse.util.async_helpers import gather_results
+from synapse.util.caches.descriptors import cached
+
+if TYPE_CHECKING:
+    from synapse.server import HomeServer
+
+# The maximum number of users returned by `UsersAdminWorkerStore.search_users`.
+SEARCH_USERS_LIMIT = 50
+
+# The columns returned for each user by `UsersAdminWorkerStore.get_users_paginate`,
+# in the order they are selected.
+_USERS_PAGINATE_COLUMNS = (
+    "name",
+    "user_type",
+    "is_guest",
+    "admin",
+    "deactivated",
+    "shadow_banned",
+    "displayname",
+    "avatar_url",
+    "creation_ts",
+    "approved",
+    "erased",
+)
+
+# The values of `UserSortOrder` which the admin users list can be ordered by. The
+# others are only for the media statistics.
+USERS_SORT_ORDERS = (
+    UserSortOrder.NAME.value,
+    UserSortOrder.DISPLAYNAME.value,
+    UserSortOrder.GUEST.value,
+    UserSortOrder.ADMIN.value,
+    UserSortOrder.DEACTIVATED.value,
+    UserSortOrder.USER_TYPE.value,
+    UserSortOrder.AVATAR_URL.value,
+    UserSortOrder.SHADOW_BANNED.value,
+    UserSortOrder.CREATION_TS.value,
+)
+
+
+class UsersAdminWorkerStore(SQLBaseStore):
+    """Read-only queries listing and searching local users, as used by the admin
+    APIs. These only read from the database, so can be run on any worker.
+    """
+
+    def __init__(
+        self,
+        database: DatabasePool,
+        db_conn: LoggingDatabaseConnection,
+        hs: "HomeServer",
+    ):
+        super().__init__(database, db_conn, hs)
+
+        # Whether the `users_populate_profile_columns` background update has
+        # finished, so the copies of the profile columns on `users` can be used.
+        self._users_profile_columns_populated = False
+
+    async def get_users(
+        self,
+        retcols: Collection[str] = (
+            "name",
+            "is_guest",
+            "admin",
+            "user_type",
+            "deactivated",
+        ),
+        limit: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[JsonDict]:
+        """Function to retrieve a list of users in users table.
+
+        Users are fetched from the database in batches ordered by user ID, so that
+        the whole table is never loaded into memory at once.
+
+        Args:
+            retcols: the columns to return for each user. Note that
+                `password_hash` is not returned unless explicitly requested.
+            limit: the maximum number of users to return, or None to return all
+                users.
+            batch_size: the number of users to fetch from the database at a time.
+
+        Returns:
+            An async iterator of dictionaries representing users.
+        """
+        # Always select the user ID as well, as it's needed to fetch the next batch.
+        sql = "SELECT name, %s FROM users WHERE name > ? ORDER BY name ASC LIMIT ?" % (
+            ", ".join(retcols),
+        )
+
+        def get_users_txn(
+            txn: LoggingTransaction, last_user_id: str, batch_limit: int
+        ) -> List[Tuple]:
+            txn.execute(sql, (last_user_id, batch_limit))
+            return txn.fetchall()
+
+        last_user_id = ""
+        remaining = limit
+        while remaining is None or remaining > 0:
+            batch_limit = (
+                batch_size if remaining is None else min(batch_size, remaining)
+            )
+            rows = await self.db_pool.runInteraction(
+                "get_users", get_users_txn, last_user_id, batch_limit
+            )
+
+            for row in rows:
+                yield dict(zip(retcols, row[1:]))
+
+            if len(rows) < batch_limit:
+                break
+
+            last_user_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    async def get_users_paginate(
+        self,
+        start: int,
+        limit: int,
+        user_id: Optional[str] = None,
+        name: Optional[str] = None,
+        guests: bool = True,
+        deactivated: bool = False,
+        order_by: str = UserSortOrder.NAME.value,
+        direction: Direction = Direction.FORWARDS,
+        approved: bool = True,
+        not_user_types: Optional[List[str]] = None,
+        after_name: Optional[str] = None,
+    ) -> Tuple[List[JsonDict], int]:
+        """Function to retrieve a paginated list of users from
+        users list. This will return a json list of users and the
+        total number of users matching the filter criteria.
+
+        Args:
+            start: start number to begin the query from
+            limit: number of rows to retrieve
+            user_id: search for user_id. ignored if name is not None
+            name: search for local part of user_id or display name
+            guests: whether to in include guest users
+            deactivated: whether to include deactivated users
+            order_by: the sort order of the returned list
+            direction: sort ascending or descending
+            approved: whether to include approved users
+            not_user_types: list of user types to exclude
+            after_name: if set, only return users which come after this user ID.
+                This allows paginating without the cost of skipping over `start`
+                rows, but is only supported when ordering by name.
+        Returns:
+            A tuple of a list of mappings from user to information and a count of total users.
+        """
+        # Check the arguments before touching the database, so that invalid ones
+        # never hold up a connection.
+        order_by_column = UserSortOrder(order_by).value
+        if order_by_column not in USERS_SORT_ORDERS:
+            raise ValueError(f"Cannot order users by {order_by}")
+
+        if after_name is not None and order_by_column != UserSortOrder.NAME.value:
+            raise ValueError("after_name is only supported when ordering by name")
+
+        if direction == Direction.BACKWARDS:
+            order = "DESC"
+        else:
+            order = "ASC"
+
+        # Once `users` has been populated with copies of the profile and erasure
+        # columns, the list can be served from `users` alone. Until then, they
+        # have to be joined in from `profiles` and `erased_users`.
+        if not self._users_profile_columns_populated:
+            self._users_profile_columns_populated = (
+                await self.db_pool.updates.has_completed_background_update(
+                    "users_populate_profile_columns"
+                )
+            )
+        use_users_columns = self._users_profile_columns_populated
+        profile_table = "u" if use_users_columns else "p"
+
+        is_profile_order = order_by_column in (
+            UserSortOrder.DISPLAYNAME.value,
+            UserSortOrder.AVATAR_URL.value,
+        )
+        if is_profile_order:
+            order_by_column = f"{profile_table}.{order_by_column}"
+
+        filters, args = _get_users_filters(
+            self.database_engine,
+            name,
+            user_id,
+            guests,
+            deactivated,
+            approved,
+            not_user_types,
+            f"{profile_table}.displayname",
+        )
+
+        async def get_count() -> int:
+            if name:
+                # Counts for name searches aren't cached, as they also depend on
+                # displaynames, which change far more often than the other filters.
+                return await self.db_pool.runInteraction(
+                    "get_users_paginate_count",
+                    self._get_users_paginate_count_txn,
+                    filters,
+                    args,
+                    not use_users_columns,
+                )
+
+            return await self._get_users_paginate_count(
+                user_id,
+                guests,
+                deactivated,
+                approved,
+                tuple(not_user_types or ()),
+            )
+
+        # Only join against `profiles` when filtering or ordering on its columns, so
+        # that the page can otherwise be looked up from `users` alone.
+        join_profiles = not use_users_columns and (bool(name) or is_profile_order)
+
+        def get_users_paginate_txn(
+            txn: LoggingTransaction,
+        ) -> List[JsonDict]:
+            # The page's user IDs are found using only the columns needed for
+            # filtering and ordering, and the full details are then joined in for
+            # just those users.
+            sql = _get_users_paginate_sql(
+                filters,
+                join_profiles,
+                use_users_columns,
+                order_by_column,
+                order,
+                after_name is not None,
+            )
+            page_args = list(args)
+            if after_name is not None:
+                page_args.append(after_name)
+            page_args += [limit, start]
+            txn.execute(sql, page_args)
+
+            # Build the dicts straight from the rows in a single pass. `erased` is
+            # already a boolean on PostgreSQL, but SQLite has no boolean type and
+            # returns it as an integer.
+            convert_erased = isinstance(self.database_engine, Sqlite3Engine)
+            users = []
+            for row in txn:
+                user = dict(zip(_USERS_PAGINATE_COLUMNS, row))
+                if convert_erased:
+                    user["erased"] = bool(user["erased"])
+                users.append(user)
+
+            return users
+
+        # The count and the page are independent, so look them up concurrently in
+        # separate transactions. A user being added or changed in between can make
+        # them disagree slightly, which is fine for the admin users list.
+        users, count = await make_deferred_yieldable(
+            gather_results(
+                (
+                    run_in_background(
+                        self.db_pool.runInteraction,
+                        "get_users_paginate_txn",
+                        get_users_paginate_txn,
+                    ),
+                    run_in_background(get_count),
+                ),
+                consumeErrors=True,
+            )
+        ).addErrback(unwrapFirstError)
+
+        return users, count
+
+    @cached(max_entries=1024, num_args=5)
+    async def _get_users_paginate_count(
+        self,
+        user_id: Optional[str],
+        guests: bool,
+        deactivated: bool,
+        approved: bool,
+        not_user_types: Tuple[str, ...],
+    ) -> int:
+        """Count the users matching the given filters of `get_users_paginate`.
+
+        This is needed for every page of the admin users list, but only changes
+        when users are registered, deactivated or approved, or have their type
+        changed. The cache is invalidated in those cases by
+        `RegistrationWorkerStore._invalidate_users_paginate_count_txn`.
+        """
+        # The displayname column is irrelevant, as we never filter by name here.
+        filters, args = _get_users_filters(
+            self.database_engine,
+            None,
+            user_id,
+            guests,
+            deactivated,
+            approved,
+            not_user_types,
+            "u.displayname",
+        )
+
+        return await self.db_pool.runInteraction(
+            "get_users_paginate_count",
+            self._get_users_paginate_count_txn,
+            filters,
+            args,
+            False,
+        )
+
+    def _get_users_paginate_count_txn(
+        self,
+        txn: LoggingTransaction,
+        filters: Tuple[str, ...],
+        args: List[Any],
+        join_profiles: bool,
+    ) -> int:
+        sql = _get_users_paginate_count_sql(filters, join_profiles)
+        txn.execute(sql, args)
+        return cast(Tuple[int], txn.fetchone())[0]
+
+    async def search_users(self, term: str) -> Optional[List[JsonDict]]:
+        """Function to search users list for one or more users with
+        the matched term.
+
+        On PostgreSQL, the `users_name_trgm` index allows this to avoid scanning
+        the whole table, if the `pg_trgm` extension is available.
+
+        Args:
+            term: search term
+
+        Returns:
+            A list of at most `SEARCH_USERS_LIMIT` dictionaries ordered by user
+            ID, or None if no term was given.
+        """
+        if not term:
+            return None
+
+        def search_users_txn(txn: LoggingTransaction) -> List[JsonDict]:
+            sql = """
+                SELECT name, password_hash, is_guest, admin, user_type
+                FROM users
+                WHERE name LIKE ?
+                ORDER BY name ASC
+                LIMIT ?
+            """
+            txn.execute(sql, ("%" + term + "%", SEARCH_USERS_LIMIT))
+            return self.db_pool.cursor_to_dict(txn)
+
+        return await self.db_pool.runInteraction(
+            "search_users", search_users_txn, db_autocommit=True
+        )
+
+
+def _get_users_filters(
+    database_engine: BaseDatabaseEngine,
+    name: Optional[str],
+    user_id: Optional[str],
+    guests: bool,
+    deactivated: bool,
+    approved: bool,
+    not_user_types: Optional[Sequence[str]],
+    displayname_column: str,
+) -> Tuple[Tuple[str, ...], List[Any]]:
+    """Build the SQL filters for the admin users list.
+
+    See `UsersAdminWorkerStore.get_users_paginate` for the meaning of the arguments.
+    `displayname_column` is the qualified column to match displaynames against,
+    i.e. `u.displayname` or `p.displayname`.
+
+    Returns:
+        A tuple of SQL conditions to be ANDed together, and the arguments for them.
+    """
+    # Only the arguments for the search terms differ between calls; the filters
+    # themselves are compiled once for each combination of options.
+    name_match = None
+    name_args: List[Any] = []
+
+    # `name` is in database already in lower case
+    if name:
+        name_lower = name.lower()
+        prefix_bounds = _get_prefix_bounds(name_lower)
+        if "%" in name or "_" in name or prefix_bounds is None:
+            name_match = _NameMatch.SUBSTRING
+            name_args = ["@%" + name_lower + "%:%", "%" + name_lower + "%"]
+        else:
+            name_match = _NameMatch.PREFIX
+            lower_bound, upper_bound = prefix_bounds
+            name_args = [
+                "@" + lower_bound,
+                "@" + upper_bound,
+                lower_bound,
+                upper_bound,
+            ]
+    elif user_id:
+        name_match = _NameMatch.USER_ID
+        name_args = ["%" + user_id.lower() + "%"]
+
+    filters, other_args = _compile_users_filters(
+        database_engine,
+        name_match,
+        guests,
+        deactivated,
+        approved,
+        tuple(not_user_types or ()),
+        displayname_column,
+    )
+    return filters, name_args + list(other_args)
+
+
+class _NameMatch(Enum):
+    """How the admin users list is being searched by name or user ID."""
+
+    # Localparts or displaynames containing the search term.
+    SUBSTRING = auto()
+    # Localparts or displaynames starting with the search term.
+    PREFIX = auto()
+    # User IDs containing the search term.
+    USER_ID = auto()
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_users_filters(
+    database_engine: BaseDatabaseEngine,
+    name_match: Optional[_NameMatch],
+    guests: bool,
+    deactivated: bool,
+    approved: bool,
+    not_user_types: Tuple[str, ...],
+    displayname_column: str,
+) -> Tuple[Tuple[str, ...], Tuple[Any, ...]]:
+    """Build the SQL filters for the admin users list, for `_get_users_filters`.
+
+    Returns:
+        A tuple of SQL conditions to be ANDed together, and the arguments for them
+        other than those for `name_match`, which come first.
+    """
+    filters = []
+    args: List[Any] = []
+
+    if name_match == _NameMatch.SUBSTRING:
+        # The search term contains wildcards, so fall back to a
+        # substring match. This can't make use of any index.
+        filters.append(f"(name LIKE ? OR LOWER({displayname_column}) LIKE ?)")
+    elif name_match == _NameMatch.PREFIX:
+        # Match localparts and displaynames starting with the search
+        # term. These are expressed as ranges rather than `LIKE 'term%'`
+        # so that the indexes on `users.name` and `LOWER(displayname)` can
+        # be used.
+        filters.append(
+            "((name >= ? AND name < ?)"
+            f" OR (LOWER({displayname_column}) >= ?"
+            f" AND LOWER({displayname_column}) < ?))"
+        )
+    elif name_match == _NameMatch.USER_ID:
+        filters.append("name LIKE ?")
+
+    if not guests:
+        filters.append("is_guest = 0")
+
+    if not deactivated:
+        filters.append("deactivated = 0")
+
+    if not approved:
+        # We ignore NULL values for the approved flag because these should only
+        # be already existing users that we consider as already approved.
+        #
+        # This must match the condition of the `users_unapproved` partial index
+        # for it to be used.
+        filters.append("approved IS FALSE")
+
+    if not_user_types:
+        if len(not_user_types) == 1 and not_user_types[0] == "":
+            # Only exclude NULL type users
+            filters.append("user_type IS NOT NULL")
+        else:
+            not_user_types_has_empty = False
+            not_user_types_without_empty = []
+
+            for not_user_type in not_user_types:
+                if not_user_type == "":
+                    not_user_types_has_empty = True
+                else:
+                    not_user_types_without_empty.append(not_user_type)
+
+            # On Postgres this is a single array argument, so the SQL is the same
+            # however many user types are excluded.
+            not_user_type_clause, not_user_type_args = make_in_list_sql_clause(
+                database_engine,
+                "u.user_type",
+                not_user_types_without_empty,
+                negative=True,
+            )
+
+            if not_user_types_has_empty:
+                # NULL values should be excluded.
+                # They evaluate to false > nothing to do here.
+                filters.append(not_user_type_clause)
+            else:
+                # NULL values should *not* be excluded.
+                # Add a special predicate to the query.
+                filters.append(
+                    "(%s OR %s IS NULL)" % (not_user_type_clause, "u.user_type")
+                )
+
+            args.extend(not_user_type_args)
+
+    return tuple(filters), tuple(args)
+
+
+# The SQL for the admin users list only depends on which filters are applied and
+# how the users are ordered, with all values passed as arguments. There are few
+# enough combinations of those to cache the SQL for each, rather than rebuilding
+# it for every page.
+
+
+@functools.lru_cache(maxsize=64)
+def _get_users_paginate_count_sql(filters: Tuple[str, ...], join_profiles: bool) -> str:
+    """Build the SQL counting the users matching the given filters.
+
+    Args:
+        filters: SQL conditions to be ANDed together, as returned by
+            `_get_users_filters`.
+        join_profiles: whether the filters refer to columns of `profiles`, as
+            aliased by `p`.
+    """
+    where_clause = "WHERE " + " AND ".join(filters) if len(filters) > 0 else ""
+
+    if join_profiles:
+        join_clause = "LEFT JOIN profiles AS p ON u.name = p.full_user_id"
+    else:
+        join_clause = ""
+
+    return f"""
+        SELECT COUNT(*) as total_users
+        FROM users as u
+        {join_clause}
+        {where_clause}
+    """
+
+
+@functools.lru_cache(maxsize=64)
+def _get_users_paginate_sql(
+    filters: Tuple[str, ...],
+    join_profiles: bool,
+    use_users_columns: bool,
+    order_by_column: str,
+    order: str,
+    after_name: bool,
+) -> str:
+    """Build the SQL selecting a page of the admin users list.
+
+    The user IDs on the page are selected in a derived table which only touches
+    the columns used for filtering and ordering, so that the full details are
+    only looked up for the users actually returned.
+
+    Args:
+        filters: SQL conditions to be ANDed together, as returned by
+            `_get_users_filters`.
+        join_profiles: whether the filters or ordering refer to columns of
+            `profiles`, as aliased by `p`.
+        use_users_columns: whether the profile and erasure columns of `users`
+            have been populated, rather than having to join in `profiles` and
+            `erased_users`.
+        order_by_column: the column to order by.
+        order: `ASC` or `DESC`.
+        after_name: whether to only select users after a given user ID. If so,
+            the user ID is expected as an argument after those of the filters.
+
+    Returns:
+        The SQL, which also takes the limit and offset of the page as its last
+        two arguments. The selected columns are those of `_USERS_PAGINATE_COLUMNS`.
+    """
+    if after_name:
+        filters += ("u.name %s ?" % (">" if order == "ASC" else "<",),)
+
+    where_clause = "WHERE " + " AND ".join(filters) if len(filters) > 0 else ""
+
+    if join_profiles:
+        join_clause = "LEFT JOIN profiles AS p ON u.name = p.full_user_id"
+    else:
+        join_clause = ""
+
+    if use_users_columns:
+        columns = "u.displayname, u.avatar_url, creation_ts * 1000, approved, erased"
+        details_join_clause = ""
+    else:
+        columns = """
+            p.displayname, p.avatar_url, creation_ts * 1000, approved,
+            eu.user_id IS NOT NULL
+        """
+        details_join_clause = """
+            LEFT JOIN profiles AS p ON u.name = p.full_user_id
+            LEFT JOIN erased_users AS eu ON u.name = eu.user_id
+        """
+
+    # Joins don't preserve the order of the derived table, so it also selects the
+    # sort key for the outer query to order by.
+    return f"""
+        SELECT u.name, user_type, is_guest, admin, deactivated, shadow_banned,
+        {columns}
+        FROM (
+            SELECT u.name AS name, {order_by_column} AS sort_key
+            FROM users as u
+            {join_clause}
+            {where_clause}
+            ORDER BY {order_by_column} {order}, u.name ASC
+            LIMIT ? OFFSET ?
+        ) AS page
+        INNER JOIN users AS u ON u.name = page.name
+        {details_join_clause}
+        ORDER BY page.sort_key {order}, page.name ASC
+    """
+
+
+def _get_prefix_bounds(prefix: str) -> Optional[Tuple[str, str]]:
+    """Get the half-open range `[lower, upper)` covering all strings which start
+    with the given prefix.
+
+    Comparing against such a range, unlike `LIKE 'prefix%'`, can be served by a
+    btree index. The range only matches exactly the strings starting with the
+    prefix when strings are ordered by code point, i.e. under the `C` collation
+    which Synapse requires of PostgreSQL databases, and which SQLite uses. With
+    `allow_unsafe_locale` and a linguistic collation, some matching strings may be
+    missed and some others included; we accept that, as such databases are
+    unsupported.
+
+    Returns:
+        The lower and upper bounds, or None if the prefix is empty or has no
+        upper bound (i.e. it consists only of the highest code point).
+    """
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+
+    next_code_point = ord(stripped[-1]) + 1
+    # Surrogates can't be encoded, so skip straight past them.
+    if 0xD800 <= next_code_point <= 0xDFFF:
+        next_code_point = 0xE000
+
+    return prefix, stripped[:-1] + chr(next_code_point)
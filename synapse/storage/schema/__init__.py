@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-SCHEMA_VERSION = 79  # remember to update the list below when updating
+SCHEMA_VERSION = 80  # remember to update the list below when updating
 """Represents the expectations made by the codebase about the database schema
 
 This should be incremented whenever the codebase changes its requirements on the
@@ -109,6 +109,11 @@ Changes in SCHEMA_VERSION = 78
 
 Changes in SCHEMA_VERSION = 79
     - We no longer write to column user_id of tables profiles and user_filters
+
+Changes in SCHEMA_VERSION = 80
+    - The displayname, avatar_url and erased columns of table users are read, as
+      copies of the corresponding columns of tables profiles and erased_users. They
+      are kept in sync by database triggers rather than by Synapse.
 """
 
 
@@ -0,0 +1,28 @@
+/* Copyright 2023 The Matrix.org Foundation C.I.C.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+-- Copies of `profiles.displayname`, `profiles.avatar_url` and whether the user is
+-- in `erased_users`, so that the admin users list doesn't need to join against
+-- those tables. These are kept up to date by triggers, see
+-- 03_users_profile_columns_triggers.py.
+ALTER TABLE users ADD COLUMN displayname TEXT;
+ALTER TABLE users ADD COLUMN avatar_url TEXT;
+ALTER TABLE users ADD COLUMN erased BOOLEAN NOT NULL DEFAULT FALSE;
+
+INSERT INTO background_updates (ordering, update_name, progress_json)
+    VALUES (8001, 'users_populate_profile_columns', '{}');
+
+INSERT INTO background_updates (ordering, update_name, progress_json, depends_on)
+    VALUES (8001, 'users_displayname_lower_idx', '{}', 'users_populate_profile_columns');
@@ -0,0 +1,134 @@
+# Copyright 2023 The Matrix.org Foundation C.I.C.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This migration adds triggers to keep the `displayname`, `avatar_url` and `erased`
+columns of `users` in sync with the `profiles` and `erased_users` tables.
+
+Doing this in the database, rather than in Synapse, means that the copies stay
+correct even when older versions of Synapse write to those tables, e.g. workers
+during a rolling upgrade, or after a rollback.
+
+Triggers cannot be expressed in .sql files, so we have to use a separate file.
+"""
+from synapse.storage.database import LoggingTransaction
+from synapse.storage.engines import BaseDatabaseEngine, PostgresEngine, Sqlite3Engine
+
+
+def run_create(cur: LoggingTransaction, database_engine: BaseDatabaseEngine) -> None:
+    if isinstance(database_engine, Sqlite3Engine):
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS users_profile_columns_insert
+            AFTER INSERT ON profiles
+            FOR EACH ROW
+            BEGIN
+                UPDATE users
+                SET displayname = NEW.displayname, avatar_url = NEW.avatar_url
+                WHERE name = NEW.full_user_id;
+            END;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS users_profile_columns_update
+            AFTER UPDATE ON profiles
+            FOR EACH ROW
+            BEGIN
+                UPDATE users
+                SET displayname = NEW.displayname, avatar_url = NEW.avatar_url
+                WHERE name = NEW.full_user_id;
+            END;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS users_profile_columns_delete
+            AFTER DELETE ON profiles
+            FOR EACH ROW
+            BEGIN
+                UPDATE users SET displayname = NULL, avatar_url = NULL
+                WHERE name = OLD.full_user_id;
+            END;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS users_erased_insert
+            AFTER INSERT ON erased_users
+            FOR EACH ROW
+            BEGIN
+                UPDATE users SET erased = TRUE WHERE name = NEW.user_id;
+            END;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS users_erased_delete
+            AFTER DELETE ON erased_users
+            FOR EACH ROW
+            BEGIN
+                UPDATE users SET erased = FALSE WHERE name = OLD.user_id;
+            END;
+            """
+        )
+    elif isinstance(database_engine, PostgresEngine):
+        cur.execute(
+            """
+            CREATE OR REPLACE FUNCTION update_users_profile_columns() RETURNS trigger AS $BODY$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    UPDATE users SET displayname = NULL, avatar_url = NULL
+                    WHERE name = OLD.full_user_id;
+                ELSE
+                    UPDATE users
+                    SET displayname = NEW.displayname, avatar_url = NEW.avatar_url
+                    WHERE name = NEW.full_user_id;
+                END IF;
+                RETURN NULL;
+            END;
+            $BODY$ LANGUAGE plpgsql;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER users_profile_columns AFTER INSERT OR UPDATE OR DELETE ON profiles
+            FOR EACH ROW
+            EXECUTE PROCEDURE update_users_profile_columns()
+            """
+        )
+
+        cur.execute(
+            """
+            CREATE OR REPLACE FUNCTION update_users_erased() RETURNS trigger AS $BODY$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    UPDATE users SET erased = FALSE WHERE name = OLD.user_id;
+                ELSE
+                    UPDATE users SET erased = TRUE WHERE name = NEW.user_id;
+                END IF;
+                RETURN NULL;
+            END;
+            $BODY$ LANGUAGE plpgsql;
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER users_erased AFTER INSERT OR DELETE ON erased_users
+            FOR EACH ROW
+            EXECUTE PROCEDURE update_users_erased()
+            """
+        )
+    else:
+        raise NotImplementedError("Unknown database engine")
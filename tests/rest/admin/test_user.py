@@ -550,21 +550,28 @@ class UsersListTestCase(unittest.HomeserverTestCase):
         user2 = "@user2:test"
 
         # Perform search tests
-        _search_test(user1, "er1")
-        _search_test(user1, "me 1")
+        _search_test(user1, "user1")
+        _search_test(user1, "name 1")
 
-        _search_test(user2, "er2")
-        _search_test(user2, "me 2")
+        _search_test(user2, "user2")
+        _search_test(user2, "name 2")
+
+        # Substring searches require a wildcard (`%25` is an escaped `%`)
+        _search_test(None, "er1")
+        _search_test(user1, "%25er1")
+        _search_test(user1, "%25me 1")
+        _search_test(user2, "us_r2")
 
         _search_test(user1, "er1", "user_id")
         _search_test(user2, "er2", "user_id")
 
         # Test case insensitive
-        _search_test(user1, "ER1")
+        _search_test(user1, "USER1")
         _search_test(user1, "NAME 1")
 
-        _search_test(user2, "ER2")
+        _search_test(user2, "USER2")
         _search_test(user2, "NAME 2")
+        _search_test(user2, "%25ER2")
 
         _search_test(user1, "ER1", "user_id")
         _search_test(user2, "ER2", "user_id")
@@ -660,6 +667,26 @@ class UsersListTestCase(unittest.HomeserverTestCase):
         self.assertEqual(400, channel.code, msg=channel.json_body)
         self.assertEqual(Codes.INVALID_PARAM, channel.json_body["errcode"])
 
+        # after when not ordering by name
+        channel = self.make_request(
+            "GET",
+            self.url + "?after=&order_by=displayname",
+            access_token=self.admin_user_tok,
+        )
+
+        self.assertEqual(400, channel.code, msg=channel.json_body)
+        self.assertEqual(Codes.INVALID_PARAM, channel.json_body["errcode"])
+
+        # after together with from
+        channel = self.make_request(
+            "GET",
+            self.url + "?after=&from=5",
+            access_token=self.admin_user_tok,
+        )
+
+        self.assertEqual(400, channel.code, msg=channel.json_body)
+        self.assertEqual(Codes.INVALID_PARAM, channel.json_body["errcode"])
+
     def test_limit(self) -> None:
         """
         Testing list of users with limit
@@ -785,6 +812,61 @@ class UsersListTestCase(unittest.HomeserverTestCase):
         self.assertEqual(len(channel.json_body["users"]), 1)
         self.assertNotIn("next_token", channel.json_body)
 
+    def test_after(self) -> None:
+        """
+        Testing pagination by user ID with `after`
+        """
+
+        number_users = 20
+        # Create one less user (since there's already an admin user).
+        self._create_users(number_users - 1)
+
+        channel = self.make_request(
+            "GET",
+            self.url + "?limit=20",
+            access_token=self.admin_user_tok,
+        )
+        self.assertEqual(200, channel.code, msg=channel.json_body)
+        all_user_ids = [u["name"] for u in channel.json_body["users"]]
+
+        for direction, expected_user_ids in (
+            ("f", all_user_ids),
+            ("b", all_user_ids[::-1]),
+        ):
+            user_ids = []
+            after = ""
+            for expected_page_size in (8, 8, 4):
+                channel = self.make_request(
+                    "GET",
+                    self.url
+                    + "?limit=8&dir=%s&after=%s"
+                    % (direction, urllib.parse.quote(after)),
+                    access_token=self.admin_user_tok,
+                )
+
+                self.assertEqual(200, channel.code, msg=channel.json_body)
+                self.assertEqual(channel.json_body["total"], number_users)
+                self.assertEqual(len(channel.json_body["users"]), expected_page_size)
+                self._check_fields(channel.json_body["users"])
+                user_ids += [u["name"] for u in channel.json_body["users"]]
+                after = channel.json_body.get("next_token", "")
+
+            # The last page has no `next_token`.
+            self.assertEqual("", after)
+            self.assertEqual(expected_user_ids, user_ids)
+
+        # An empty page has no user ID to continue from.
+        channel = self.make_request(
+            "GET",
+            self.url + "?limit=0&after=",
+            access_token=self.admin_user_tok,
+        )
+
+        self.assertEqual(200, channel.code, msg=channel.json_body)
+        self.assertEqual(channel.json_body["total"], number_users)
+        self.assertEqual(channel.json_body["users"], [])
+        self.assertNotIn("next_token", channel.json_body)
+
     def test_order_by(self) -> None:
         """
         Testing order list with parameter `order_by`
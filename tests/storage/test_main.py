@@ -13,7 +13,11 @@
 # limitations under the License.
 
 
-from synapse.types import UserID
+from typing import Any, List
+
+from synapse.api.constants import Direction
+from synapse.storage.databases.main.users_admin import SEARCH_USERS_LIMIT
+from synapse.types import JsonDict, UserID
 
 from tests import unittest
 
@@ -35,15 +39,196 @@ class DataStoreTestCase(unittest.HomeserverTestCase):
         )
 
         users, total = self.get_success(
-            self.store.get_users_paginate(0, 10, name="bc", guests=False)
+            self.store.get_users_paginate(0, 10, name="abc", guests=False)
         )
 
         self.assertEqual(1, total)
         self.assertEqual(self.displayname, users.pop()["displayname"])
 
         users, total = self.get_success(
-            self.store.get_users_paginate(0, 10, name="BC", guests=False)
+            self.store.get_users_paginate(0, 10, name="ABC", guests=False)
+        )
+
+        self.assertEqual(1, total)
+        self.assertEqual(self.displayname, users.pop()["displayname"])
+
+        users, total = self.get_success(
+            self.store.get_users_paginate(0, 10, name="fra", guests=False)
+        )
+
+        self.assertEqual(1, total)
+        self.assertEqual(self.user.to_string(), users.pop()["name"])
+
+        # A bare term only matches the start of the localpart or displayname...
+        users, total = self.get_success(
+            self.store.get_users_paginate(0, 10, name="bc", guests=False)
+        )
+
+        self.assertEqual(0, total)
+
+        # ... unless wildcards are used.
+        users, total = self.get_success(
+            self.store.get_users_paginate(0, 10, name="%bc", guests=False)
         )
 
         self.assertEqual(1, total)
         self.assertEqual(self.displayname, users.pop()["displayname"])
+
+    def test_get_users_paginate_after_name(self) -> None:
+        for localpart in ("alice", "bob", "charlie"):
+            self.get_success(self.store.register_user(f"@{localpart}:test", "pass"))
+
+        users, total = self.get_success(
+            self.store.get_users_paginate(0, 10, after_name="@alice:test")
+        )
+
+        self.assertEqual(3, total)
+        self.assertEqual(["@bob:test", "@charlie:test"], [u["name"] for u in users])
+
+        users, total = self.get_success(
+            self.store.get_users_paginate(
+                0, 10, direction=Direction.BACKWARDS, after_name="@charlie:test"
+            )
+        )
+
+        self.assertEqual(3, total)
+        self.assertEqual(["@bob:test", "@alice:test"], [u["name"] for u in users])
+
+    def test_get_users_paginate_invalid_order(self) -> None:
+        """Ordering by a column which isn't about users is rejected."""
+        self.get_failure(
+            self.store.get_users_paginate(0, 10, order_by="media_length"), ValueError
+        )
+        self.get_failure(
+            self.store.get_users_paginate(
+                0, 10, order_by="displayname", after_name="@alice:test"
+            ),
+            ValueError,
+        )
+
+    def test_get_users_paginate_count_invalidation(self) -> None:
+        """The cached count of users is updated when users are added or changed."""
+        self.get_success(self.store.register_user("@alice:test", "pass"))
+
+        _, total = self.get_success(self.store.get_users_paginate(0, 10))
+        self.assertEqual(1, total)
+
+        self.get_success(self.store.register_user("@bob:test", "pass"))
+
+        _, total = self.get_success(self.store.get_users_paginate(0, 10))
+        self.assertEqual(2, total)
+
+        self.get_success(self.store.set_user_deactivated_status("@bob:test", True))
+
+        _, total = self.get_success(self.store.get_users_paginate(0, 10))
+        self.assertEqual(1, total)
+
+    def test_get_users_paginate_profile_columns(self) -> None:
+        """Profile changes and erasures are reflected in the users list."""
+        self.get_success(self.store.register_user("@alice:test", "pass"))
+        self.get_success(
+            self.store.set_profile_displayname(UserID.from_string("@alice:test"), "Al")
+        )
+        self.get_success(
+            self.store.set_profile_avatar_url(
+                UserID.from_string("@alice:test"), "mxc://test/al"
+            )
+        )
+        self.get_success(self.store.mark_user_erased("@alice:test"))
+
+        users, _ = self.get_success(self.store.get_users_paginate(0, 10, name="al"))
+        self.assertEqual(1, len(users))
+        self.assertEqual("Al", users[0]["displayname"])
+        self.assertEqual("mxc://test/al", users[0]["avatar_url"])
+        self.assertIs(True, users[0]["erased"])
+
+        self.get_success(
+            self.store.set_profile_displayname(UserID.from_string("@alice:test"), None)
+        )
+        self.get_success(self.store.mark_user_not_erased("@alice:test"))
+
+        users, _ = self.get_success(self.store.get_users_paginate(0, 10))
+        self.assertIsNone(users[0]["displayname"])
+        self.assertIs(False, users[0]["erased"])
+
+    def test_get_users_paginate_before_profile_columns_populated(self) -> None:
+        """Until `users` has been populated with the profile columns, they are
+        joined in from `profiles` and `erased_users`.
+        """
+        for localpart, displayname in (("alice", "Zed"), ("bob", "Al")):
+            user_id = UserID.from_string(f"@{localpart}:test")
+            self.get_success(self.store.register_user(user_id.to_string(), "pass"))
+            self.get_success(self.store.set_profile_displayname(user_id, displayname))
+        self.get_success(self.store.mark_user_erased("@bob:test"))
+
+        # Clear the copies on `users` and pretend they have yet to be populated,
+        # so that only the joins can find the profiles.
+        self.get_success(
+            self.store.db_pool.simple_update(
+                table="users",
+                keyvalues={},
+                updatevalues={"displayname": None, "erased": False},
+                desc="clear_users_profile_columns",
+            )
+        )
+        self.get_success(
+            self.store.db_pool.simple_insert(
+                table="background_updates",
+                values={
+                    "update_name": "users_populate_profile_columns",
+                    "progress_json": "{}",
+                },
+            )
+        )
+        self.store.db_pool.updates._all_done = False
+        self.store._users_profile_columns_populated = False
+
+        users, total = self.get_success(self.store.get_users_paginate(0, 10, name="al"))
+        self.assertEqual(1, total)
+        self.assertEqual("@bob:test", users[0]["name"])
+        self.assertEqual("Al", users[0]["displayname"])
+        self.assertIs(True, users[0]["erased"])
+
+        users, total = self.get_success(
+            self.store.get_users_paginate(0, 10, order_by="displayname")
+        )
+        self.assertEqual(2, total)
+        self.assertEqual(["Al", "Zed"], [u["displayname"] for u in users])
+        self.assertEqual([True, False], [u["erased"] for u in users])
+
+    def test_get_users(self) -> None:
+        for localpart in ("alice", "bob", "charlie"):
+            self.get_success(self.store.register_user(f"@{localpart}:test", "pass"))
+
+        async def get_users(**kwargs: Any) -> List[JsonDict]:
+            return [user async for user in self.store.get_users(**kwargs)]
+
+        users = self.get_success(get_users(batch_size=2))
+        self.assertEqual(
+            ["@alice:test", "@bob:test", "@charlie:test"], [u["name"] for u in users]
+        )
+        self.assertNotIn("password_hash", users[0])
+
+        users = self.get_success(get_users(limit=2, batch_size=1))
+        self.assertEqual(["@alice:test", "@bob:test"], [u["name"] for u in users])
+
+        users = self.get_success(get_users(retcols=("name", "password_hash")))
+        self.assertEqual(3, len(users))
+        self.assertIsNotNone(users[0]["password_hash"])
+
+    def test_search_users(self) -> None:
+        for i in range(SEARCH_USERS_LIMIT + 1):
+            self.get_success(self.store.register_user(f"@user{i:02}:test", "pass"))
+        self.get_success(self.store.register_user("@other:test", "pass"))
+
+        users = self.get_success(self.store.search_users("ser1"))
+        assert users is not None
+        self.assertEqual(
+            [f"@user1{i}:test" for i in range(10)], [u["name"] for u in users]
+        )
+
+        # The number of results is capped.
+        users = self.get_success(self.store.search_users("user"))
+        assert users is not None
+        self.assertEqual(SEARCH_USERS_LIMIT, len(users))
+        self.assertEqual("@user00:test", users[0]["name"])
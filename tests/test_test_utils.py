@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import List
+
 from tests import unittest
 from tests.utils import MockClock
 
@@ -70,3 +72,15 @@ class MockClockTestCase(unittest.TestCase):
 
         self.assertFalse(invoked[0])
         self.assertTrue(invoked[1])
+
+    def test_later_order(self) -> None:
+        """Timers fire in the order they are due, regardless of scheduling order."""
+        invoked: List[int] = []
+
+        self.clock.call_later(20, invoked.append, 2)
+        self.clock.call_later(10, invoked.append, 0)
+        self.clock.call_later(10, invoked.append, 1)
+
+        self.clock.advance_time(30)
+
+        self.assertEqual([0, 1, 2], invoked)
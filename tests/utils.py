@@ -14,6 +14,8 @@
 # limitations under the License.
 
 import atexit
+import heapq
+import itertools
 import os
 from typing import Any, Callable, Dict, List, Tuple, Type, TypeVar, Union, overload
 
@@ -240,8 +242,11 @@ class MockClock:
     now = 1000.0
 
     def __init__(self) -> None:
-        # Timers in no particular order
-        self.timers: List[Timer] = []
+        # A heap of pending timers, ordered by the time they are due to fire and
+        # then by the order they were scheduled in. Cancelled timers are marked
+        # as expired and dropped when they reach the top of the heap.
+        self._timers: List[Tuple[float, int, Timer]] = []
+        self._timer_seq = itertools.count()
         self.loopers: List[Looper] = []
 
     def time(self) -> float:
@@ -264,7 +269,7 @@ class MockClock:
             callback(*args, **kwargs)
 
         t = Timer(self.now + delay, wrapped_callback, False)
-        self.timers.append(t)
+        heapq.heappush(self._timers, (t.absolute_time, next(self._timer_seq), t))
 
         return t
 
@@ -283,24 +288,24 @@ class MockClock:
                 raise Exception("Cannot cancel an expired timer")
 
         timer.expired = True
-        self.timers = [t for t in self.timers if t != timer]
 
     # For unit testing
     def advance_time(self, secs: float) -> None:
         self.now += secs
 
-        timers = self.timers
-        self.timers = []
+        # Collect the due timers before running any of them, so that timers
+        # scheduled by the callbacks wait for the next call.
+        due: List[Timer] = []
+        while self._timers and self._timers[0][0] <= self.now:
+            due.append(heapq.heappop(self._timers)[2])
 
-        for t in timers:
+        for t in due:
             if t.expired:
-                raise Exception("Timer already expired")
+                # The timer was cancelled.
+                continue
 
-            if self.now >= t.absolute_time:
-                t.expired = True
-                t.callback()
-            else:
-                self.timers.append(t)
+            t.expired = True
+            t.callback()
 
         for looped in self.loopers:
             if looped.last + looped.interval < self.now: